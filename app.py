@@ -1,15 +1,39 @@
 import os
-import requests
+
+# Enable XLA auto-clustering before TensorFlow is imported
+os.environ.setdefault("TF_XLA_FLAGS", "--tf_xla_auto_jit=2")
+
+# CPU threading knobs, read at TF import: route convs through oneDNN
+# and keep OpenMP threads pinned instead of migrating between cores
+os.environ.setdefault("TF_ENABLE_ONEDNN_OPTS", "1")
+os.environ.setdefault("OMP_NUM_THREADS", str(os.cpu_count()))
+os.environ.setdefault("KMP_AFFINITY", "granularity=fine,compact,1,0")
+
 import tensorflow as tf
+
+tf.config.optimizer.set_jit(True)
+
+# Single-request latency: give each op all cores, run ops sequentially
+# rather than oversubscribing with parallel ops per request
+tf.config.threading.set_intra_op_parallelism_threads(os.cpu_count())
+tf.config.threading.set_inter_op_parallelism_threads(1)
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
 import tempfile
-import numpy as np
-from PIL import Image
-import io
+import asyncio
+import concurrent.futures
+import hashlib
 import logging
+from collections import OrderedDict
+import numpy as np
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -18,163 +42,195 @@ logger = logging.getLogger(__name__)
 # ===============================
 # CONFIGURATION
 # ===============================
-MODEL_DIR = "models"
 MODEL_PATH = "models/resnet_final.keras"
-GDRIVE_FILE_ID = "1qIKWggK9hm66SoEhWNe1qEToCbQfgUN5"
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024  # 10MB
+CLASS_NAMES = ("NORMAL", "PNEUMONIA", "COVID-19", "TUBERCULOSIS")
 
 # ===============================
-# SAFE MODEL DOWNLOAD
+# LOAD MODEL
 # ===============================
-def download_model_safely():
-    """Download model without crashing the app"""
-    if os.path.exists(MODEL_PATH):
-        size_mb = os.path.getsize(MODEL_PATH) / (1024 * 1024)
-        logger.info(f"✅ Model already exists: {size_mb:.2f} MB")
-        return True
-    
-    os.makedirs(MODEL_DIR, exist_ok=True)
-    logger.info("⬇️ Downloading model...")
-    
-    # Multiple download attempts with different methods
-    download_methods = [
-        # Method 1: Direct requests with cookie handling
-        lambda: direct_download_with_cookies(),
-        # Method 2: Alternative URL pattern
-        lambda: alternative_download(),
-        # Method 3: Create minimal model as fallback
-        lambda: create_minimal_model()
-    ]
-    
-    for i, method in enumerate(download_methods, 1):
-        logger.info(f"Attempt {i}/{len(download_methods)}...")
+def cast_model_fp16(model):
+    """Clone the model under a mixed_float16 policy (GPU deployments)"""
+    policy = tf.keras.mixed_precision.Policy("mixed_float16")
+
+    def _with_policy(layer):
+        config = layer.get_config()
+        # Keep the softmax head in float32 for numerical stability
+        config["dtype"] = "float32" if layer is model.layers[-1] else policy
+        return layer.__class__.from_config(config)
+
+    clone = tf.keras.models.clone_model(model, clone_function=_with_policy)
+    clone.set_weights(model.get_weights())
+    return clone
+
+# The model artifact is fetched at build time (see fetch_model.py and
+# the render.yaml buildCommand), so startup does no network I/O.
+try:
+    logger.info("🔄 Loading TensorFlow model...")
+    # compile=False skips rebuilding optimizer/metric state we never use
+    model = tf.keras.models.load_model(MODEL_PATH, compile=False)
+    logger.info("✅ Model loaded successfully")
+
+    # Halve weight bandwidth on GPU deployments (tensor-core FP16)
+    if tf.config.list_physical_devices("GPU"):
         try:
-            if method():
-                if os.path.exists(MODEL_PATH) and os.path.getsize(MODEL_PATH) > 1024:
-                    size_mb = os.path.getsize(MODEL_PATH) / (1024 * 1024)
-                    logger.info(f"✅ Model downloaded successfully: {size_mb:.2f} MB")
-                    return True
+            model = cast_model_fp16(model)
+            logger.info("✅ Model cast to mixed_float16")
         except Exception as e:
-            logger.warning(f"Attempt {i} failed: {str(e)[:100]}")
-    
-    # If all methods fail, create a dummy model
-    logger.warning("All download methods failed. Creating minimal model...")
-    return create_minimal_model()
+            logger.warning(f"FP16 cast failed, keeping float32 weights: {e}")
+
+    # Walking and formatting the whole graph is slow and noisy; only log
+    # the summary when explicitly asked for
+    if os.environ.get("LOG_MODEL_SUMMARY") == "1":
+        model.summary(print_fn=logger.info)
 
-def direct_download_with_cookies():
-    """Direct download with cookie handling for Google Drive"""
+except Exception as e:
+    logger.error(f"❌ Failed to load model: {e}")
+    logger.info("⚠️ Running in demo mode with minimal functionality")
+    model = None
+
+# ===============================
+# PREPROCESSING GRAPH
+# ===============================
+# The model was trained on [0,1]-scaled inputs, so normalization is a
+# single scale factor. It lives in the graph as a constant (XLA folds it
+# into the first conv); if a future model expects ImageNet stats, swap
+# in per-channel mean/std constants here rather than in Python code.
+NORM_SCALE = tf.constant(1.0 / 255.0, tf.float32)
+
+@tf.function(input_signature=[tf.TensorSpec([], tf.string)])
+def preprocess(image_bytes):
+    """Decode, resize, normalize and batch an image in a single graph"""
+    # Fast integer-DCT path for JPEGs; generic decode for PNG and friends.
+    # Pixels stay uint8 until resize, which casts to float32 exactly once.
+    is_jpeg = tf.strings.substr(image_bytes, 0, 3) == b"\xff\xd8\xff"
+    img = tf.cond(
+        is_jpeg,
+        lambda: tf.io.decode_jpeg(image_bytes, channels=3,
+                                  dct_method="INTEGER_FAST"),
+        lambda: tf.io.decode_image(image_bytes, channels=3,
+                                   expand_animations=False),
+    )
+    img.set_shape([None, None, 3])
+    img = tf.image.resize(img, [224, 224], method="bilinear")
+    img = img * NORM_SCALE
+    return img[tf.newaxis]
+
+def preprocess_cv2(image_bytes):
+    """Decode + resize through OpenCV's SIMD (libjpeg-turbo) kernels"""
+    arr = np.frombuffer(image_bytes, np.uint8)
+    bgr = cv2.imdecode(arr, cv2.IMREAD_COLOR)
+    if bgr is None:
+        raise ValueError("Could not decode image")
+    rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+    rgb = cv2.resize(rgb, (224, 224), interpolation=cv2.INTER_LINEAR)
+    x = rgb.astype(np.float32) * (1.0 / 255.0)
+    return tf.constant(x[np.newaxis])
+
+def decode_and_preprocess(image_bytes):
+    """Decode, resize and normalize an upload into a (1,224,224,3) tensor"""
+    if CV2_AVAILABLE:
+        return preprocess_cv2(image_bytes)
+    return preprocess(tf.constant(image_bytes))
+
+# ===============================
+# CACHED INFERENCE FUNCTION
+# ===============================
+def build_inference_fn(model):
+    """Compile the forward pass + class ranking into one XLA graph"""
+    def forward(x):
+        # The model already ends in softmax; rank every class in-graph
+        # so Python never loops over or sorts the probabilities
+        return tf.math.top_k(model(x, training=False), k=len(CLASS_NAMES))
+
+    infer_fn = tf.function(forward, jit_compile=True)
+    return infer_fn.get_concrete_function(
+        tf.TensorSpec([None, 224, 224, 3], tf.float32)
+    )
+
+infer = build_inference_fn(model) if model is not None else None
+
+# Prefer a prebuilt TensorRT engine when one is shipped with the deploy
+TRT_PLAN_PATH = "models/resnet_final.plan"
+
+trt_engine = None
+if os.path.exists(TRT_PLAN_PATH):
+    from trt_infer import load_engine
+    trt_engine = load_engine(TRT_PLAN_PATH)
+
+def build_tftrt_fn(model):
+    """Wrap the model with TF-TRT FP16 engines (GPU deployments only)"""
+    # TF-TRT converts from a SavedModel, so export the loaded model first
+    sm_dir = os.path.join(tempfile.mkdtemp(prefix="thoraxsense_"), "saved_model")
+    tf.saved_model.save(model, sm_dir)
+
+    params = tf.experimental.tensorrt.ConversionParams(
+        precision_mode="FP16",
+        max_workspace_size_bytes=1 << 30,
+        maximum_cached_engines=1,
+        minimum_segment_size=3,
+    )
+    converter = tf.experimental.tensorrt.Converter(
+        input_saved_model_dir=sm_dir, conversion_params=params
+    )
+    converted_fn = converter.convert()
+    # Build the engine now so the first request doesn't pay for it
+    converter.build(input_fn=lambda: [tf.zeros([1, 224, 224, 3], tf.float32)])
+
+    def infer_fn(x):
+        out = converted_fn(x)
+        if isinstance(out, dict):
+            out = next(iter(out.values()))
+        # Same (values, indices) contract as build_inference_fn
+        return tf.math.top_k(out, k=len(CLASS_NAMES))
+
+    return infer_fn
+
+# No prebuilt engine: try TF-TRT conversion of the Keras model
+tftrt_fn = None
+if trt_engine is None and model is not None and tf.config.list_physical_devices("GPU"):
     try:
-        # URL patterns that might work
-        urls = [
-            f"https://docs.google.com/uc?export=download&id={GDRIVE_FILE_ID}&confirm=t",
-            f"https://drive.google.com/uc?export=download&id={GDRIVE_FILE_ID}",
-        ]
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        
-        for url in urls:
-            try:
-                session = requests.Session()
-                response = session.get(url, headers=headers, stream=True, timeout=60)
-                
-                # Handle confirmation for large files
-                for key, value in response.cookies.items():
-                    if key.startswith('download_warning'):
-                        confirm_url = f"{url}&confirm={value}"
-                        response = session.get(confirm_url, headers=headers, stream=True, timeout=60)
-                        break
-                
-                # Download with progress
-                total_size = int(response.headers.get('content-length', 0))
-                downloaded = 0
-                
-                with open(MODEL_PATH, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
-                            if total_size > 0:
-                                percent = (downloaded / total_size) * 100
-                                logger.info(f"\rDownloaded: {downloaded/1024/1024:.1f} MB ({percent:.1f}%)", end="")
-                
-                logger.info("")  # New line
-                return True
-                
-            except Exception as e:
-                logger.warning(f"URL attempt failed: {e}")
-                continue
-                
+        logger.info("🔄 Converting model with TF-TRT (FP16)...")
+        tftrt_fn = build_tftrt_fn(model)
+        logger.info("✅ TF-TRT conversion succeeded")
     except Exception as e:
-        logger.error(f"Direct download failed: {e}")
-    
-    return False
+        logger.warning(f"TF-TRT conversion failed, keeping XLA graph: {e}")
 
-def alternative_download():
-    """Try alternative download methods"""
-    try:
-        # Try using wget if available (works on Render.com)
-        import subprocess
-        result = subprocess.run([
-            "wget", "--no-check-certificate",
-            f"https://drive.google.com/uc?export=download&id={GDRIVE_FILE_ID}&confirm=t",
-            "-O", MODEL_PATH
-        ], capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            return True
-    except:
-        pass
-    
-    return False
+# Alternative to TensorRT: an ONNX Runtime session with IOBinding
+# (exported offline by convert_model.py)
+ONNX_PATH = "models/resnet_final.onnx"
+
+ort_session = None
+if trt_engine is None and os.path.exists(ONNX_PATH):
+    from ort_infer import load_session
+    ort_session = load_session(ONNX_PATH)
+
+# On CPU-only deploys, prefer an INT8 TFLite model when one is shipped
+# (built offline by convert_model.py)
+TFLITE_PATH = "models/resnet_final.tflite"
 
-def create_minimal_model():
-    """Create a minimal TensorFlow model as fallback"""
+tflite_interp = None
+if trt_engine is None and ort_session is None and os.path.exists(TFLITE_PATH):
     try:
-        logger.info("Creating minimal model for demo purposes...")
-        
-        # Create a very small model
-        model = tf.keras.Sequential([
-            tf.keras.layers.Input(shape=(224, 224, 3)),
-            tf.keras.layers.Conv2D(8, (3, 3), activation='relu'),
-            tf.keras.layers.GlobalAveragePooling2D(),
-            tf.keras.layers.Dense(4, activation='softmax')  # 4 classes
-        ])
-        
-        # Compile the model
-        model.compile(
-            optimizer='adam',
-            loss='categorical_crossentropy',
-            metrics=['accuracy']
+        tflite_interp = tf.lite.Interpreter(
+            model_path=TFLITE_PATH, num_threads=os.cpu_count()
         )
-        
-        # Save the model
-        model.save(MODEL_PATH)
-        logger.info(f"✅ Created minimal model at {MODEL_PATH}")
-        return True
-        
+        tflite_interp.allocate_tensors()
+        logger.info(f"✅ TFLite INT8 model loaded from {TFLITE_PATH}")
     except Exception as e:
-        logger.error(f"Failed to create minimal model: {e}")
-        return False
+        logger.warning(f"Failed to load TFLite model: {e}")
+        tflite_interp = None
 
-# ===============================
-# DOWNLOAD AND LOAD MODEL
-# ===============================
-logger.info("Initializing model...")
-download_model_safely()
-
-try:
-    logger.info("🔄 Loading TensorFlow model...")
-    model = tf.keras.models.load_model(MODEL_PATH)
-    logger.info("✅ Model loaded successfully")
-    
-    # Check model summary
-    model.summary(print_fn=logger.info)
-    
-except Exception as e:
-    logger.error(f"❌ Failed to load model: {e}")
-    logger.info("⚠️ Running in demo mode with minimal functionality")
-    model = None
+def tflite_infer(batch):
+    """Run a float32 batch through the TFLite interpreter"""
+    in_detail = tflite_interp.get_input_details()[0]
+    out_detail = tflite_interp.get_output_details()[0]
+    if tuple(in_detail["shape"]) != tuple(batch.shape):
+        tflite_interp.resize_tensor_input(in_detail["index"], batch.shape)
+        tflite_interp.allocate_tensors()
+    tflite_interp.set_tensor(in_detail["index"], batch)
+    tflite_interp.invoke()
+    return tflite_interp.get_tensor(out_detail["index"])
 
 # ===============================
 # FASTAPI APP
@@ -194,12 +250,122 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ===============================
+# MICRO-BATCHING
+# ===============================
+MAX_BATCH = 16
+MAX_WAIT_MS = 10
+
+# Preallocated staging buffer; batch slices are assigned in place so the
+# hot path does no per-request batch allocation
+INPUT_BUF = tf.Variable(
+    tf.zeros([MAX_BATCH, 224, 224, 3], tf.float32), trainable=False
+)
+
+batch_queue = None  # created on startup (needs the running event loop)
+batch_task = None   # strong reference so the worker task isn't GC'd
+
+# Two workers so one request's decode can overlap another's inference;
+# TensorFlow releases the GIL inside its kernels
+INFER_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+
+def rank_probs(probs):
+    """NumPy ranking for backends without the in-graph top_k"""
+    order = np.argsort(probs)[::-1]
+    return probs[order], order
+
+def run_batch(inputs):
+    """Run one staged batch; yields (values, indices) per request
+
+    Blocking, so it always runs inside INFER_POOL.
+    """
+    if trt_engine is not None:
+        # The TRT engine is built for batch 1; run items back to back
+        return [rank_probs(trt_engine.infer(item.numpy())[0]) for item in inputs]
+    if ort_session is not None:
+        # The ONNX graph is exported with batch 1; run items back to back
+        return [rank_probs(ort_session.infer(item.numpy())[0]) for item in inputs]
+    if tftrt_fn is not None:
+        # The single cached TF-TRT engine is built for batch 1; feeding
+        # other batch sizes would force an engine rebuild per size change
+        results = []
+        for item in inputs:
+            values, indices = tftrt_fn(item)
+            results.append((values.numpy()[0], indices.numpy()[0]))
+        return results
+    if tflite_interp is not None:
+        return [rank_probs(row)
+                for row in tflite_infer(tf.concat(inputs, axis=0).numpy())]
+    # Stage the batch into the preallocated buffer in place
+    for i, item in enumerate(inputs):
+        INPUT_BUF[i:i + 1].assign(item)
+    values, indices = infer(INPUT_BUF[:len(inputs)])
+    return list(zip(values.numpy(), indices.numpy()))
+
+async def batch_worker():
+    """Coalesce concurrent requests into one batched forward pass"""
+    loop = asyncio.get_running_loop()
+    while True:
+        x, future = await batch_queue.get()
+        inputs, futures = [x], [future]
+
+        # Wait briefly for more requests to arrive, up to MAX_BATCH
+        deadline = loop.time() + MAX_WAIT_MS / 1000.0
+        while len(inputs) < MAX_BATCH:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                x, future = await asyncio.wait_for(batch_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            inputs.append(x)
+            futures.append(future)
+
+        try:
+            # Run the blocking forward pass off the event loop so new
+            # connections keep being accepted while TF computes
+            probs = await loop.run_in_executor(INFER_POOL, run_batch, inputs)
+            # Futures are aligned with the batch axis, so order is preserved
+            for fut, row in zip(futures, probs):
+                if not fut.done():
+                    fut.set_result(row)
+        except Exception as e:
+            for fut in futures:
+                if not fut.done():
+                    fut.set_exception(e)
+
+# ===============================
+# RESULT CACHE
+# ===============================
+# Repeat uploads of the same X-ray (retries, demos, duplicate dashboard
+# views) skip the forward pass entirely: hashing is O(bytes) while
+# inference is O(GFLOPs). Bounded LRU keyed by content hash; only
+# touched from the event loop.
+CACHE_MAX_ENTRIES = 1024
+result_cache = OrderedDict()
+
 # ===============================
 # PREDICTION FUNCTION
 # ===============================
-def predict_image(image_bytes):
+def format_result(values, indices):
+    """Format already-ranked class probabilities into the API response"""
+    results = [
+        {"class": CLASS_NAMES[idx], "confidence": float(value)}
+        for value, idx in zip(values, indices)
+    ]
+
+    return {
+        "success": True,
+        "predictions": results,
+        "primary_diagnosis": results[0]["class"],
+        "confidence": results[0]["confidence"]
+    }
+
+async def predict_image(image_bytes):
     """Make prediction on an image"""
-    if model is None:
+    if (model is None and trt_engine is None and ort_session is None
+            and tflite_interp is None):
         return {
             "success": False,
             "error": "Model not loaded",
@@ -211,41 +377,32 @@ def predict_image(image_bytes):
                 {"class": "TUBERCULOSIS", "confidence": 0.00}
             ]
         }
-    
+
+    # Identical bytes always produce the identical prediction
+    key = hashlib.sha256(image_bytes).digest()
+    cached = result_cache.get(key)
+    if cached is not None:
+        result_cache.move_to_end(key)
+        return cached
+
     try:
-        # Load and preprocess image
-        image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
-        image = image.resize((224, 224))  # Adjust based on your model input
-        
-        # Convert to array and preprocess
-        img_array = tf.keras.preprocessing.image.img_to_array(image)
-        img_array = tf.expand_dims(img_array, 0)  # Create batch dimension
-        img_array = img_array / 255.0  # Normalize
-        
-        # Make prediction
-        predictions = model.predict(img_array, verbose=0)
-        
-        # Assuming model outputs 4 classes
-        class_names = ["NORMAL", "PNEUMONIA", "COVID-19", "TUBERCULOSIS"]
-        
-        # Format results
-        results = []
-        for i, prob in enumerate(predictions[0]):
-            results.append({
-                "class": class_names[i],
-                "confidence": float(prob)
-            })
-        
-        # Sort by confidence
-        results.sort(key=lambda x: x["confidence"], reverse=True)
-        
-        return {
-            "success": True,
-            "predictions": results,
-            "primary_diagnosis": results[0]["class"],
-            "confidence": results[0]["confidence"]
-        }
-        
+        # Decode + resize + normalize + batch, run off the event loop
+        # since the decode is blocking C++ work
+        loop = asyncio.get_running_loop()
+        x = await loop.run_in_executor(INFER_POOL, decode_and_preprocess,
+                                       image_bytes)
+
+        # Hand off to the micro-batcher and wait for our row of the batch
+        future = loop.create_future()
+        await batch_queue.put((x, future))
+        values, indices = await future
+
+        result = format_result(values, indices)
+        result_cache[key] = result
+        if len(result_cache) > CACHE_MAX_ENTRIES:
+            result_cache.popitem(last=False)
+        return result
+
     except Exception as e:
         logger.error(f"Prediction error: {e}")
         return {
@@ -256,6 +413,17 @@ def predict_image(image_bytes):
 # ===============================
 # API ENDPOINTS
 # ===============================
+@app.on_event("startup")
+async def start_batch_worker():
+    global batch_queue, batch_task
+    batch_queue = asyncio.Queue()
+    batch_task = asyncio.create_task(batch_worker())
+
+@app.on_event("shutdown")
+async def stop_batch_worker():
+    if batch_task is not None:
+        batch_task.cancel()
+
 @app.get("/")
 async def root():
     return {
@@ -286,15 +454,16 @@ async def predict_xray(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="File must be an image")
     
     try:
-        # Read image file
-        contents = await file.read()
-        
-        # Validate file size (max 10MB)
-        if len(contents) > 10 * 1024 * 1024:
-            raise HTTPException(status_code=400, detail="File too large (max 10MB)")
-        
+        # Stream the upload in chunks, rejecting oversize payloads early
+        # instead of buffering the whole body before the size check
+        buf = bytearray()
+        while chunk := await file.read(1024 * 1024):
+            if len(buf) + len(chunk) > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=400, detail="File too large (max 10MB)")
+            buf.extend(chunk)
+
         # Make prediction
-        result = predict_image(contents)
+        result = await predict_image(bytes(buf))
         
         if not result.get("success", False):
             raise HTTPException(
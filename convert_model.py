@@ -0,0 +1,106 @@
+"""
+Offline model conversion for deployment.
+
+Run on a build machine (not at request time) to produce faster serving
+artifacts from models/resnet_final.keras:
+
+    python convert_model.py onnx                # -> models/resnet_final.onnx
+    python convert_model.py tflite [calib_dir]  # -> models/resnet_final.tflite
+
+The TensorRT INT8 engine is then built with trtexec on the target GPU
+(engines are not portable across GPU architectures), using a directory
+of representative chest X-rays for calibration:
+
+    trtexec --onnx=models/resnet_final.onnx --int8 \
+        --calib=calib.cache --saveEngine=models/resnet_final.plan
+
+app.py automatically prefers models/resnet_final.plan when it exists.
+"""
+import os
+import sys
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = "models/resnet_final.keras"
+ONNX_PATH = "models/resnet_final.onnx"
+TFLITE_PATH = "models/resnet_final.tflite"
+
+
+def export_onnx():
+    """Export the Keras model to ONNX for the TensorRT build step"""
+    import tensorflow as tf
+    import tf2onnx
+
+    logger.info(f"🔄 Loading {MODEL_PATH}...")
+    model = tf.keras.models.load_model(MODEL_PATH, compile=False)
+
+    spec = (tf.TensorSpec([1, 224, 224, 3], tf.float32, name="input"),)
+    logger.info("🔄 Converting to ONNX...")
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=17,
+                               output_path=ONNX_PATH)
+
+    size_mb = os.path.getsize(ONNX_PATH) / (1024 * 1024)
+    logger.info(f"✅ Saved {ONNX_PATH} ({size_mb:.2f} MB)")
+
+
+def make_representative_dataset(calib_dir):
+    """Yield calibration batches for INT8 quantization"""
+    import numpy as np
+    import tensorflow as tf
+
+    def rep_dataset():
+        if calib_dir and os.path.isdir(calib_dir):
+            for name in sorted(os.listdir(calib_dir))[:200]:
+                path = os.path.join(calib_dir, name)
+                try:
+                    raw = tf.io.read_file(path)
+                    img = tf.io.decode_image(raw, channels=3,
+                                             expand_animations=False)
+                except tf.errors.InvalidArgumentError:
+                    continue
+                img = tf.image.resize(img, [224, 224], method="bilinear")
+                img = tf.cast(img, tf.float32) * (1.0 / 255.0)
+                yield [img[tf.newaxis]]
+        else:
+            # Random data calibrates the ranges poorly; only for smoke tests
+            logger.warning("No calibration directory given; using random data. "
+                           "Use real chest X-rays for production engines.")
+            for _ in range(100):
+                yield [np.random.uniform(0, 1, (1, 224, 224, 3)).astype(np.float32)]
+
+    return rep_dataset
+
+
+def export_tflite(calib_dir=None):
+    """Quantize the model to INT8 TFLite for CPU-only deployments"""
+    import tensorflow as tf
+
+    logger.info(f"🔄 Loading {MODEL_PATH}...")
+    model = tf.keras.models.load_model(MODEL_PATH, compile=False)
+
+    logger.info("🔄 Quantizing to INT8 TFLite...")
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = make_representative_dataset(calib_dir)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    # I/O stays float32 so serving shares one preprocessing path
+    tflite_model = converter.convert()
+
+    with open(TFLITE_PATH, "wb") as f:
+        f.write(tflite_model)
+
+    size_mb = os.path.getsize(TFLITE_PATH) / (1024 * 1024)
+    logger.info(f"✅ Saved {TFLITE_PATH} ({size_mb:.2f} MB)")
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else "onnx"
+    if target == "onnx":
+        export_onnx()
+    elif target == "tflite":
+        export_tflite(sys.argv[2] if len(sys.argv) > 2 else None)
+    else:
+        logger.error(f"Unknown target: {target}")
+        sys.exit(1)
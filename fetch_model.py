@@ -0,0 +1,100 @@
+"""
+Build-time model fetch for deployment.
+
+Run during the deploy build (see render.yaml buildCommand), never at
+request time:
+
+    python fetch_model.py
+
+Downloads models/resnet_final.keras from Google Drive, or creates a
+minimal fallback model so the app can still boot in demo mode. app.py
+only loads whatever artifact this script leaves behind.
+"""
+import os
+import shutil
+import logging
+import requests
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = "models"
+MODEL_PATH = "models/resnet_final.keras"
+GDRIVE_FILE_ID = "1qIKWggK9hm66SoEhWNe1qEToCbQfgUN5"
+
+
+def download_model():
+    """Download the model from Google Drive with cookie handling"""
+    urls = [
+        f"https://docs.google.com/uc?export=download&id={GDRIVE_FILE_ID}&confirm=t",
+        f"https://drive.google.com/uc?export=download&id={GDRIVE_FILE_ID}",
+    ]
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+
+    for url in urls:
+        try:
+            session = requests.Session()
+            response = session.get(url, headers=headers, stream=True, timeout=60)
+
+            # Handle confirmation for large files
+            for key, value in response.cookies.items():
+                if key.startswith('download_warning'):
+                    confirm_url = f"{url}&confirm={value}"
+                    response = session.get(confirm_url, headers=headers, stream=True, timeout=60)
+                    break
+
+            # Stream straight to disk in 1 MiB chunks; the model is a few
+            # hundred MB, so never materialize the body in memory
+            response.raw.decode_content = True
+            with open(MODEL_PATH, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=1 << 20)
+
+            if os.path.getsize(MODEL_PATH) > 1024:
+                return True
+
+        except Exception as e:
+            logger.warning(f"URL attempt failed: {e}")
+
+    return False
+
+
+def create_minimal_model():
+    """Create a minimal TensorFlow model so the app can boot in demo mode"""
+    import tensorflow as tf
+
+    logger.info("Creating minimal model for demo purposes...")
+
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(224, 224, 3)),
+        tf.keras.layers.Conv2D(8, (3, 3), activation='relu'),
+        tf.keras.layers.GlobalAveragePooling2D(),
+        tf.keras.layers.Dense(4, activation='softmax')  # 4 classes
+    ])
+
+    # No compile step: the model is only ever used for inference
+    model.save(MODEL_PATH)
+    logger.info(f"✅ Created minimal model at {MODEL_PATH}")
+
+
+def main():
+    if os.path.exists(MODEL_PATH):
+        size_mb = os.path.getsize(MODEL_PATH) / (1024 * 1024)
+        logger.info(f"✅ Model already exists: {size_mb:.2f} MB")
+        return
+
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    logger.info("⬇️ Downloading model...")
+
+    if download_model():
+        size_mb = os.path.getsize(MODEL_PATH) / (1024 * 1024)
+        logger.info(f"✅ Model downloaded successfully: {size_mb:.2f} MB")
+        return
+
+    logger.warning("Download failed. Creating minimal model...")
+    create_minimal_model()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Optional ONNX Runtime backend for the ResNet classifier.
+
+The .onnx file is exported offline by convert_model.py. The session is
+created once at startup and inference goes through IOBinding with a
+preallocated input OrtValue, so input/output arrays are not marshalled
+through Python on every call. onnxruntime is optional; without it the
+TensorFlow paths are used.
+"""
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import onnxruntime as ort
+    ORT_AVAILABLE = True
+except ImportError:
+    ORT_AVAILABLE = False
+
+
+class ORTSession:
+    """ONNX Runtime session with its IOBinding bound once at startup"""
+
+    def __init__(self, onnx_path):
+        self.sess = ort.InferenceSession(
+            onnx_path,
+            providers=[
+                ("CUDAExecutionProvider", {"device_id": 0}),
+                "CPUExecutionProvider",
+            ],
+        )
+        self.input_name = self.sess.get_inputs()[0].name
+        self.output_name = self.sess.get_outputs()[0].name
+
+        device = ("cuda" if "CUDAExecutionProvider" in self.sess.get_providers()
+                  else "cpu")
+
+        # Bind a preallocated input buffer once; update it in place per call.
+        # The export keeps TF's NHWC layout, so no transpose is needed.
+        self.input_val = ort.OrtValue.ortvalue_from_numpy(
+            np.zeros((1, 224, 224, 3), dtype=np.float32), device, 0
+        )
+        self.io_binding = self.sess.io_binding()
+        self.io_binding.bind_ortvalue_input(self.input_name, self.input_val)
+        self.io_binding.bind_output(self.output_name, device)
+
+    def infer(self, x):
+        """Run one forward pass on a (1, 224, 224, 3) float32 array"""
+        self.input_val.update_inplace(np.ascontiguousarray(x, dtype=np.float32))
+        self.sess.run_with_iobinding(self.io_binding)
+        return self.io_binding.copy_outputs_to_cpu()[0]
+
+
+def load_session(onnx_path):
+    """Return an ORTSession, or None if onnxruntime is unavailable"""
+    if not ORT_AVAILABLE:
+        logger.info("onnxruntime not installed; using TensorFlow inference")
+        return None
+    try:
+        session = ORTSession(onnx_path)
+        logger.info(f"✅ ONNX Runtime session loaded from {onnx_path}")
+        return session
+    except Exception as e:
+        logger.warning(f"Failed to create ONNX Runtime session: {e}")
+        return None
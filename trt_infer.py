@@ -0,0 +1,68 @@
+"""
+Optional TensorRT runtime for the ResNet classifier.
+
+Engines are built offline by convert_model.py (ONNX export + trtexec);
+at runtime we only deserialize the .plan and execute it. TensorRT and
+CUDA imports are optional so the stock Keras path keeps working on
+CPU-only deployments.
+"""
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tensorrt as trt
+    import pycuda.autoinit  # noqa: F401 - creates the CUDA context
+    import pycuda.driver as cuda
+    TRT_AVAILABLE = True
+except ImportError:
+    TRT_AVAILABLE = False
+
+
+class TRTEngine:
+    """Deserialized TensorRT engine with preallocated pinned buffers"""
+
+    def __init__(self, plan_path):
+        runtime = trt.Runtime(trt.Logger(trt.Logger.WARNING))
+        with open(plan_path, "rb") as f:
+            self.engine = runtime.deserialize_cuda_engine(f.read())
+        self.context = self.engine.create_execution_context()
+        self.stream = cuda.Stream()
+
+        self.input_name = self.engine.get_tensor_name(0)
+        self.output_name = self.engine.get_tensor_name(1)
+        in_shape = tuple(self.engine.get_tensor_shape(self.input_name))
+        out_shape = tuple(self.engine.get_tensor_shape(self.output_name))
+
+        # Pinned host + device buffers, allocated once at startup
+        self.h_input = cuda.pagelocked_empty(in_shape, dtype=np.float32)
+        self.h_output = cuda.pagelocked_empty(out_shape, dtype=np.float32)
+        self.d_input = cuda.mem_alloc(self.h_input.nbytes)
+        self.d_output = cuda.mem_alloc(self.h_output.nbytes)
+        self.context.set_tensor_address(self.input_name, int(self.d_input))
+        self.context.set_tensor_address(self.output_name, int(self.d_output))
+
+    def infer(self, x):
+        """Run one forward pass on a (1, 224, 224, 3) float32 array"""
+        np.copyto(self.h_input, x)
+        cuda.memcpy_htod_async(self.d_input, self.h_input, self.stream)
+        self.context.execute_async_v3(self.stream.handle)
+        cuda.memcpy_dtoh_async(self.h_output, self.d_output, self.stream)
+        self.stream.synchronize()
+        return self.h_output.copy()
+
+
+def load_engine(plan_path):
+    """Return a TRTEngine, or None if TensorRT/CUDA is unavailable"""
+    if not TRT_AVAILABLE:
+        logger.info("TensorRT not installed; using TensorFlow inference")
+        return None
+    try:
+        engine = TRTEngine(plan_path)
+        logger.info(f"✅ TensorRT engine loaded from {plan_path}")
+        return engine
+    except Exception as e:
+        logger.warning(f"Failed to load TensorRT engine: {e}")
+        return None